@@ -1,58 +1,42 @@
-from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Form, status
+from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Form, Header, Query, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, FileResponse, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import MongoClient
-from pydantic import BaseModel, Field, EmailStr
+from pymongo import MongoClient, ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError, ServerSelectionTimeoutError
+from pydantic import BaseModel, Field, EmailStr, ConfigDict, ValidationError
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 import os
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import uuid
 import hashlib
 import jwt
 import bcrypt
-import json
 import base64
 from pathlib import Path
-import shutil
 import mimetypes
-from bson import ObjectId
-from fastapi.encoders import jsonable_encoder
-
-# Custom JSON encoder for MongoDB ObjectId
-class CustomJSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, ObjectId):
-            return str(obj)
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
-
-# Custom jsonable_encoder to handle MongoDB ObjectId
-def custom_jsonable_encoder(obj, **kwargs):
-    if isinstance(obj, ObjectId):
-        return str(obj)
-    if isinstance(obj, list):
-        return [custom_jsonable_encoder(item, **kwargs) for item in obj]
-    if isinstance(obj, dict):
-        return {k: custom_jsonable_encoder(v, **kwargs) for k, v in obj.items()}
-    return jsonable_encoder(obj, **kwargs)
+import re
+from types import MappingProxyType
+from urllib.parse import quote
+from cachetools import TTLCache
+import aiofiles
+import orjson
 
 load_dotenv()
 
-# Custom response class to handle MongoDB ObjectId serialization
+logger = logging.getLogger(__name__)
+
+# Renders responses with orjson; queries project out _id, so no ObjectId reaches here
 class MongoJSONResponse(JSONResponse):
     def render(self, content):
-        return json.dumps(
-            content,
-            ensure_ascii=False,
-            allow_nan=False,
-            indent=None,
-            separators=(",", ":"),
-            cls=CustomJSONEncoder,
-        ).encode("utf-8")
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
 
 app = FastAPI(title="PharmaVault EDMS", version="1.0.0", default_response_class=MongoJSONResponse)
 
@@ -65,20 +49,54 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON list responses; file downloads are already-compressed binaries
+# (PDF/Office) and should reach the client untouched with their Content-Length
+class JSONGZipMiddleware:
+    def __init__(self, app, **gzip_options):
+        self.app = app
+        self.gzip = GZipMiddleware(app, **gzip_options)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not scope["path"].endswith("/download"):
+            await self.gzip(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+app.add_middleware(JSONGZipMiddleware, minimum_size=512, compresslevel=4)
+
 # Security
 security = HTTPBearer()
 SECRET_KEY = "pharmavault-secret-key-2025"
+SECRET_KEY_BYTES = SECRET_KEY.encode()  # encoded once for HMAC signing
+JWT_ALGORITHM = "HS256"
 
 # MongoDB setup
 MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.getenv("DB_NAME", "pharmavault_db")
 
-client = AsyncIOMotorClient(MONGO_URL)
+client = AsyncIOMotorClient(
+    MONGO_URL,
+    maxPoolSize=100,
+    minPoolSize=10,
+    maxIdleTimeMS=30000,
+    serverSelectionTimeoutMS=3000,
+    compressors="zstd,zlib"
+)
 db = client[DB_NAME]
 
 # File storage
 UPLOAD_DIR = Path("/tmp/pharmavault_uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+MAX_UPLOAD_SIZE = 50 * 1024 * 1024  # 50MB limit
+MAX_PAGE_SIZE = 200  # keeps the single $facet result well under Mongo's 16MB document cap
+# When set, downloads are handed to the fronting nginx via X-Accel-Redirect
+# (e.g. "/protected" mapped as an internal location onto UPLOAD_DIR)
+X_ACCEL_REDIRECT_PREFIX = os.getenv("X_ACCEL_REDIRECT_PREFIX")
+
+# Auth caches
+_jwt_cache = TTLCache(maxsize=10000, ttl=30)  # token digest -> decoded payload
+_user_cache = TTLCache(maxsize=5000, ttl=60)  # user id -> user document
 
 # Pydantic models
 class User(BaseModel):
@@ -150,13 +168,66 @@ class ElectronicSignature(BaseModel):
     reason: str
     location: str = "Digital"
 
+class BatchReadItem(BaseModel):
+    path: str  # read endpoint under /api, e.g. "dashboard" or "search"
+    params: Dict[str, Any] = Field(default_factory=dict)
+
+class BatchReadRequest(BaseModel):
+    requests: List[BatchReadItem]
+
+# Typed query parameters for each batchable read, mirroring the route signatures
+class BatchNoParams(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+class BatchDocumentsParams(BatchNoParams):
+    skip: int = Field(0, ge=0)
+    limit: int = Field(50, ge=1, le=MAX_PAGE_SIZE)
+    document_type: Optional[str] = None
+    status: Optional[str] = None
+
+class BatchSearchParams(BatchNoParams):
+    q: str
+    document_type: Optional[str] = None
+
+class BatchAuditParams(BatchNoParams):
+    skip: int = 0
+    limit: int = 100
+    resource_id: Optional[str] = None
+    action: Optional[str] = None
+    resource_id: Optional[str] = None
+    action: Optional[str] = None
+
 # Utility functions
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+BCRYPT_ROUNDS = 10  # ~50-100ms per hash, tuned for interactive login
+
+# bcrypt releases the GIL, so threads hash in parallel across cores; a dedicated
+# pool keeps login bursts from starving other default-executor work (aiofiles)
+_password_executor = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="bcrypt")
 
 def verify_password(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
+async def verify_password_async(password: str, hashed: str) -> bool:
+    # bcrypt is CPU-bound; run it off the event loop
+    return await asyncio.get_running_loop().run_in_executor(_password_executor, verify_password, password, hashed)
+
+# Salts pre-generated in the background so registration never waits on entropy
+_salt_pool: asyncio.Queue = asyncio.Queue(maxsize=256)
+
+async def refill_salts():
+    loop = asyncio.get_running_loop()
+    while True:
+        salt = await loop.run_in_executor(_password_executor, bcrypt.gensalt, BCRYPT_ROUNDS)
+        await _salt_pool.put(salt)
+
+async def hash_password_async(password: str) -> str:
+    try:
+        salt = _salt_pool.get_nowait()
+    except asyncio.QueueEmpty:
+        salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+    hashed = await asyncio.get_running_loop().run_in_executor(_password_executor, bcrypt.hashpw, password.encode('utf-8'), salt)
+    return hashed.decode('utf-8')
+
 def create_jwt_token(user_data: dict) -> str:
     payload = {
         "user_id": user_data["id"],
@@ -164,23 +235,38 @@ def create_jwt_token(user_data: dict) -> str:
         "role": user_data["role"],
         "exp": datetime.utcnow() + timedelta(hours=24)
     }
-    return jwt.encode(payload, SECRET_KEY, algorithm="HS256")
+    return jwt.encode(payload, SECRET_KEY_BYTES, algorithm=JWT_ALGORITHM)
 
 def verify_jwt_token(token: str) -> dict:
+    token_hash = hashlib.sha256(token.encode()).hexdigest()[:32]
+    payload = _jwt_cache.get(token_hash)
+    if payload is not None:
+        # Cached entries never outlive the token itself
+        if payload["exp"] > time.time():
+            return payload
+        _jwt_cache.pop(token_hash, None)
+        raise HTTPException(status_code=401, detail="Token expired")
+    
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        return payload
+        payload = jwt.decode(token, SECRET_KEY_BYTES, algorithms=[JWT_ALGORITHM])
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.JWTError:
+    except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    
+    # Only signature-valid payloads are cached
+    _jwt_cache[token_hash] = payload
+    return payload
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     token = credentials.credentials
     payload = verify_jwt_token(token)
-    user = await db.users.find_one({"id": payload["user_id"]})
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
+    user = _user_cache.get(payload["user_id"])
+    if user is None:
+        user = await db.users.find_one({"id": payload["user_id"]}, {"_id": 0})
+        if not user:
+            raise HTTPException(status_code=401, detail="User not found")
+        _user_cache[payload["user_id"]] = user
     return user
 
 async def log_audit(user_id: str, user_name: str, action: str, resource_type: str, resource_id: str, details: dict = None):
@@ -192,7 +278,83 @@ async def log_audit(user_id: str, user_name: str, action: str, resource_type: st
         resource_id=resource_id,
         details=details or {}
     )
-    await db.audit_logs.insert_one(audit_log.dict())
+    # Written in batches by flush_audit_logs
+    _audit_queue.put_nowait(audit_log.dict())
+
+# Audit events are queued per request and flushed with insert_many
+_audit_queue: asyncio.Queue = asyncio.Queue()
+_AUDIT_STOP = object()  # queued at shutdown; everything ahead of it is written first
+AUDIT_FLUSH_INTERVAL = 0.1  # seconds
+AUDIT_FLUSH_BATCH_SIZE = 500
+AUDIT_RETRY_DELAY = 1.0  # seconds between attempts for entries that failed to write
+AUDIT_SHUTDOWN_RETRIES = 3
+AUDIT_MAX_PENDING = 10_000  # failed entries held for retry before the oldest are dropped
+
+async def _write_audit_batch(batch: list) -> list:
+    """Insert audit entries, returning the ones that still need writing"""
+    try:
+        await db.audit_logs.insert_many(batch, ordered=False)
+        return []
+    except BulkWriteError as e:
+        # Entries keep the _id assigned on the first attempt, so ones that already
+        # landed come back as duplicate-key errors on retry and are not failures
+        failed = [batch[err["index"]] for err in e.details["writeErrors"] if err["code"] != 11000]
+        if failed:
+            logger.warning("Failed to write %d audit log entries, will retry", len(failed), exc_info=True)
+        return failed
+    except PyMongoError:
+        logger.warning("Failed to write %d audit log entries, will retry", len(batch), exc_info=True)
+        return batch
+    except Exception:
+        # Anything else must not kill the flusher; keep the entries for the next attempt
+        logger.exception("Unexpected error writing %d audit log entries, will retry", len(batch))
+        return batch
+
+async def flush_audit_logs():
+    loop = asyncio.get_running_loop()
+    pending = []  # entries whose last write failed
+    while True:
+        if pending:
+            try:
+                entry = await asyncio.wait_for(_audit_queue.get(), AUDIT_RETRY_DELAY)
+            except asyncio.TimeoutError:
+                entry = None
+        else:
+            entry = await _audit_queue.get()
+        
+        batch = pending
+        deadline = loop.time() + AUDIT_FLUSH_INTERVAL
+        while entry is not None and entry is not _AUDIT_STOP:
+            batch.append(entry)
+            entry = None
+            while len(batch) < AUDIT_FLUSH_BATCH_SIZE and loop.time() < deadline:
+                try:
+                    entry = _audit_queue.get_nowait()
+                    break
+                except asyncio.QueueEmpty:
+                    await asyncio.sleep(0.005)
+        stopping = entry is _AUDIT_STOP
+        
+        pending = await _write_audit_batch(batch) if batch else []
+        if len(pending) > AUDIT_MAX_PENDING:
+            dropped = pending[:-AUDIT_MAX_PENDING]
+            pending = pending[-AUDIT_MAX_PENDING:]
+            logger.error("Dropping %d audit log entries after repeated write failures: %r", len(dropped), dropped)
+        
+        if stopping:
+            for _ in range(AUDIT_SHUTDOWN_RETRIES):
+                if not pending:
+                    break
+                await asyncio.sleep(AUDIT_RETRY_DELAY)
+                pending = await _write_audit_batch(pending)
+            if pending:
+                logger.error("Could not write %d audit log entries before shutdown: %r", len(pending), pending)
+            return
+
+def _audit_flusher_done(task: asyncio.Task):
+    # The flusher only returns on the shutdown marker; anything else means audit logs stop being written
+    if not task.cancelled() and task.exception() is not None:
+        logger.critical("Audit log flusher stopped unexpectedly; audit entries are no longer written", exc_info=task.exception())
 
 # Document type categories
 DOCUMENT_CATEGORIES = {
@@ -205,6 +367,82 @@ DOCUMENT_CATEGORIES = {
     "Regulatory": ["Submissions", "Correspondence", "Approvals", "Inspections"]
 }
 
+# Approval workflow templates per document type, copied into each new document
+_REGULATORY_WORKFLOW = (
+    MappingProxyType({"step_name": "Quality Review", "assignee_role": "QualityManager", "status": "Pending"}),
+    MappingProxyType({"step_name": "Regulatory Review", "assignee_role": "RegulatoryAffairs", "status": "Pending"}),
+    MappingProxyType({"step_name": "Final Approval", "assignee_role": "Admin", "status": "Pending"})
+)
+_PROCEDURE_WORKFLOW = (
+    MappingProxyType({"step_name": "Technical Review", "assignee_role": "QualityManager", "status": "Pending"}),
+    MappingProxyType({"step_name": "Management Approval", "assignee_role": "Admin", "status": "Pending"})
+)
+_WORKFLOW_TEMPLATES = MappingProxyType({
+    **{t: _REGULATORY_WORKFLOW for t in ("CTD", "eCTD", "Regulatory")},
+    **{t: _PROCEDURE_WORKFLOW for t in ("SOP", "Protocol")}
+})
+_DEFAULT_WORKFLOW = ()
+
+# Static config payload, serialized once at import
+_DOCUMENT_TYPES_JSON = orjson.dumps({"document_types": DOCUMENT_CATEGORIES})
+_DOCUMENT_TYPES_ETAG = f'"{hashlib.sha256(_DOCUMENT_TYPES_JSON).hexdigest()[:32]}"'
+
+# Startup
+@app.on_event("startup")
+async def create_indexes():
+    # Back the listing filters and sorts with indexes instead of collection scans
+    indexes = [
+        (db.documents, [("id", 1)], {"unique": True}),
+        (db.documents, [("document_type", 1), ("status", 1), ("created_at", -1)], {}),
+        (db.documents, [("status", 1), ("created_at", -1)], {}),
+        (db.documents, [("created_at", -1)], {}),
+        (db.documents, [("title", "text"), ("description", "text"), ("tags", "text")], {}),
+        (db.audit_logs, [("resource_id", 1), ("timestamp", -1)], {}),
+        (db.audit_logs, [("action", 1), ("timestamp", -1)], {}),
+        (db.audit_logs, [("timestamp", -1)], {}),
+        (db.users, [("id", 1)], {"unique": True}),
+        (db.users, [("email", 1)], {"unique": True}),
+    ]
+    # A missing index degrades performance (or, for the text index, search) but
+    # must not keep the app from starting, e.g. on duplicate legacy emails
+    for collection, keys, options in indexes:
+        try:
+            await collection.create_index(keys, **options)
+        except ServerSelectionTimeoutError:
+            logger.error("MongoDB unreachable at startup; indexes were not created", exc_info=True)
+            return
+        except PyMongoError:
+            logger.error("Could not create index %s on %s", keys, collection.name, exc_info=True)
+
+@app.on_event("startup")
+async def start_salt_pool():
+    app.state.salt_refill_task = asyncio.create_task(refill_salts())
+
+@app.on_event("startup")
+async def start_audit_flusher():
+    app.state.audit_flush_task = asyncio.create_task(flush_audit_logs())
+    app.state.audit_flush_task.add_done_callback(_audit_flusher_done)
+
+@app.on_event("shutdown")
+async def drain_audit_queue():
+    if app.state.audit_flush_task.done():
+        # Already reported by _audit_flusher_done; nothing will write what is still queued
+        logger.error("Audit log flusher is not running; %d queued entries were not written", _audit_queue.qsize())
+        return
+    # Let the flusher write everything queued so far, including its in-flight batch
+    _audit_queue.put_nowait(_AUDIT_STOP)
+    await app.state.audit_flush_task
+
+@app.on_event("shutdown")
+async def shutdown_password_executor():
+    # The salt refill task submits to the executor, so stop it first
+    app.state.salt_refill_task.cancel()
+    try:
+        await app.state.salt_refill_task
+    except asyncio.CancelledError:
+        pass
+    _password_executor.shutdown(wait=False)
+
 # API Routes
 
 @app.get("/api/health")
@@ -215,12 +453,12 @@ async def health_check():
 @app.post("/api/auth/register")
 async def register(user_data: UserCreate):
     # Check if user exists
-    existing_user = await db.users.find_one({"email": user_data.email})
+    existing_user = await db.users.find_one({"email": user_data.email}, {"_id": 0})
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create user
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await hash_password_async(user_data.password)
     user = User(
         email=user_data.email,
         full_name=user_data.full_name,
@@ -231,15 +469,19 @@ async def register(user_data: UserCreate):
     user_dict = user.dict()
     user_dict["password"] = hashed_password
     
-    await db.users.insert_one(user_dict)
+    try:
+        await db.users.insert_one(user_dict)
+    except DuplicateKeyError:
+        # Lost a race with a concurrent registration of the same email
+        raise HTTPException(status_code=400, detail="Email already registered")
     await log_audit(user.id, user.full_name, "USER_REGISTERED", "User", user.id)
     
     return {"message": "User registered successfully", "user_id": user.id}
 
 @app.post("/api/auth/login")
 async def login(login_data: UserLogin):
-    user = await db.users.find_one({"email": login_data.email})
-    if not user or not verify_password(login_data.password, user["password"]):
+    user = await db.users.find_one({"email": login_data.email}, {"_id": 0})
+    if not user or not await verify_password_async(login_data.password, user["password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     if not user["is_active"]:
@@ -271,18 +513,23 @@ async def upload_document(
     tags: str = Form(""),
     current_user: dict = Depends(get_current_user)
 ):
-    # Validate file
-    if file.size > 50 * 1024 * 1024:  # 50MB limit
-        raise HTTPException(status_code=400, detail="File too large")
-    
     # Create file path
     file_id = str(uuid.uuid4())
     file_extension = Path(file.filename).suffix
     file_path = UPLOAD_DIR / f"{file_id}{file_extension}"
     
-    # Save file
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # Stream file to disk without blocking the event loop, sizing it as we go
+    file_size = 0
+    async with aiofiles.open(file_path, "wb") as buffer:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            file_size += len(chunk)
+            if file_size > MAX_UPLOAD_SIZE:
+                break
+            await buffer.write(chunk)
+    
+    if file_size > MAX_UPLOAD_SIZE:
+        file_path.unlink(missing_ok=True)
+        raise HTTPException(status_code=400, detail="File too large")
     
     # Create document record
     document = Document(
@@ -292,7 +539,7 @@ async def upload_document(
         category=category,
         file_path=str(file_path),
         file_name=file.filename,
-        file_size=file.size,
+        file_size=file_size,
         mime_type=file.content_type or mimetypes.guess_type(file.filename)[0] or "application/octet-stream",
         uploaded_by=current_user["id"],
         tags=tags.split(",") if tags else [],
@@ -304,17 +551,8 @@ async def upload_document(
     )
     
     # Initialize approval workflow based on document type
-    if document_type in ["CTD", "eCTD", "Regulatory"]:
-        document.approval_workflow = [
-            {"step_name": "Quality Review", "assignee_role": "QualityManager", "status": "Pending"},
-            {"step_name": "Regulatory Review", "assignee_role": "RegulatoryAffairs", "status": "Pending"},
-            {"step_name": "Final Approval", "assignee_role": "Admin", "status": "Pending"}
-        ]
-    elif document_type in ["SOP", "Protocol"]:
-        document.approval_workflow = [
-            {"step_name": "Technical Review", "assignee_role": "QualityManager", "status": "Pending"},
-            {"step_name": "Management Approval", "assignee_role": "Admin", "status": "Pending"}
-        ]
+    workflow_template = _WORKFLOW_TEMPLATES.get(document_type, _DEFAULT_WORKFLOW)
+    document.approval_workflow = [dict(step) for step in workflow_template]
     
     await db.documents.insert_one(document.dict())
     await log_audit(current_user["id"], current_user["full_name"], "DOCUMENT_UPLOADED", "Document", document.id, {"title": title, "type": document_type})
@@ -323,8 +561,8 @@ async def upload_document(
 
 @app.get("/api/documents")
 async def get_documents(
-    skip: int = 0,
-    limit: int = 50,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
     document_type: Optional[str] = None,
     status: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
@@ -335,13 +573,18 @@ async def get_documents(
     if status:
         filter_query["status"] = status
     
-    documents = await db.documents.find(filter_query).skip(skip).limit(limit).to_list(length=limit)
-    total = await db.documents.count_documents(filter_query)
-    
-    # Convert ObjectId to string
-    for doc in documents:
-        if '_id' in doc:
-            doc['_id'] = str(doc['_id'])
+    # Page and total count from a single pass over the filter
+    pipeline = [
+        {"$match": filter_query},
+        {"$project": {"_id": 0}},
+        {"$facet": {
+            "docs": [{"$skip": skip}, {"$limit": limit}],
+            "total": [{"$count": "n"}]
+        }}
+    ]
+    [result] = await db.documents.aggregate(pipeline).to_list(length=1)
+    documents = result["docs"]
+    total = result["total"][0]["n"] if result["total"] else 0
     
     return {
         "documents": documents,
@@ -352,29 +595,37 @@ async def get_documents(
 
 @app.get("/api/documents/{document_id}")
 async def get_document(document_id: str, current_user: dict = Depends(get_current_user)):
-    document = await db.documents.find_one({"id": document_id})
+    document = await db.documents.find_one({"id": document_id}, {"_id": 0})
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    # Convert ObjectId to string
-    if '_id' in document:
-        document['_id'] = str(document['_id'])
-    
     await log_audit(current_user["id"], current_user["full_name"], "DOCUMENT_VIEWED", "Document", document_id)
     return document
 
 @app.get("/api/documents/{document_id}/download")
 async def download_document(document_id: str, current_user: dict = Depends(get_current_user)):
-    document = await db.documents.find_one({"id": document_id})
+    document = await db.documents.find_one({"id": document_id}, {"_id": 0})
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
     file_path = Path(document["file_path"])
-    if not file_path.exists():
+    try:
+        stat_result = file_path.stat()
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="File not found")
     
     await log_audit(current_user["id"], current_user["full_name"], "DOCUMENT_DOWNLOADED", "Document", document_id)
-    return FileResponse(file_path, filename=document["file_name"])
+    
+    if X_ACCEL_REDIRECT_PREFIX:
+        # nginx serves the bytes with sendfile and Range support
+        return Response(
+            media_type=document["mime_type"],
+            headers={
+                "X-Accel-Redirect": f"{X_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{file_path.name}",
+                "Content-Disposition": f"attachment; filename*=utf-8''{quote(document['file_name'])}"
+            }
+        )
+    return FileResponse(file_path, filename=document["file_name"], stat_result=stat_result)
 
 # Workflow Management
 @app.post("/api/documents/{document_id}/approve")
@@ -384,34 +635,66 @@ async def approve_document_step(
     comments: str = Form(""),
     current_user: dict = Depends(get_current_user)
 ):
-    document = await db.documents.find_one({"id": document_id})
-    if not document:
-        raise HTTPException(status_code=404, detail="Document not found")
-    
-    workflow = document["approval_workflow"]
-    if step_index >= len(workflow):
+    if step_index < 0:
         raise HTTPException(status_code=400, detail="Invalid workflow step")
     
-    step = workflow[step_index]
-    if step["assignee_role"] != current_user["role"] and current_user["role"] != "Admin":
-        raise HTTPException(status_code=403, detail="Not authorized for this approval step")
+    step_path = f"approval_workflow.{step_index}"
+    filter_query = {"id": document_id, step_path: {"$exists": True}}
+    if current_user["role"] != "Admin":
+        filter_query[f"{step_path}.assignee_role"] = current_user["role"]
     
-    # Update workflow step
-    workflow[step_index].update({
+    # Complete the step and recompute the status server-side in one round-trip
+    now = datetime.now()
+    step_update = {
         "status": "Completed",
-        "assignee_id": current_user["id"],
-        "completed_at": datetime.now(),
-        "comments": comments
-    })
+        "assignee_id": {"$literal": current_user["id"]},
+        "completed_at": now,
+        "comments": {"$literal": comments}
+    }
+    pipeline = [
+        {"$set": {"approval_workflow": {"$map": {
+            "input": {"$range": [0, {"$size": "$approval_workflow"}]},
+            "as": "i",
+            "in": {"$cond": [
+                {"$eq": ["$$i", step_index]},
+                {"$mergeObjects": [{"$arrayElemAt": ["$approval_workflow", "$$i"]}, step_update]},
+                {"$arrayElemAt": ["$approval_workflow", "$$i"]}
+            ]}
+        }}}},
+        {"$set": {
+            "status": {"$cond": [
+                {"$allElementsTrue": [{"$map": {
+                    "input": "$approval_workflow",
+                    "as": "s",
+                    "in": {"$eq": ["$$s.status", "Completed"]}
+                }}]},
+                "Approved",
+                "UnderReview"
+            ]},
+            "modified_at": now
+        }}
+    ]
+    updated = await db.documents.find_one_and_update(
+        filter_query,
+        pipeline,
+        projection={"_id": 0, "status": 1},
+        return_document=ReturnDocument.AFTER
+    )
     
-    # Check if all steps are completed
-    all_completed = all(step["status"] == "Completed" for step in workflow)
-    new_status = "Approved" if all_completed else "UnderReview"
+    if not updated:
+        # Work out why the update matched nothing
+        document = await db.documents.find_one(
+            {"id": document_id},
+            {"_id": 0, "id": 1, "approval_workflow": {"$slice": [step_index, 1]}}
+        )
+        if not document:
+            raise HTTPException(status_code=404, detail="Document not found")
+        if not document.get("approval_workflow"):
+            raise HTTPException(status_code=400, detail="Invalid workflow step")
+        raise HTTPException(status_code=403, detail="Not authorized for this approval step")
     
-    await db.documents.update_one(
-        {"id": document_id},
-        {"$set": {"approval_workflow": workflow, "status": new_status, "modified_at": datetime.now()}}
-    )
+    new_status = updated["status"]
+    all_completed = new_status == "Approved"
     
     await log_audit(current_user["id"], current_user["full_name"], "DOCUMENT_APPROVED", "Document", document_id, {"step": step_index, "comments": comments})
     
@@ -423,7 +706,7 @@ async def reject_document(
     reason: str,
     current_user: dict = Depends(get_current_user)
 ):
-    document = await db.documents.find_one({"id": document_id})
+    document = await db.documents.find_one({"id": document_id}, {"_id": 0})
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
@@ -444,18 +727,20 @@ async def sign_document(
     password: str,
     current_user: dict = Depends(get_current_user)
 ):
-    # Verify user password
-    user = await db.users.find_one({"id": current_user["id"]})
-    if not verify_password(password, user["password"]):
+    # Verify user password (current_user is the full user document)
+    if not await verify_password_async(password, current_user["password"]):
         raise HTTPException(status_code=401, detail="Invalid password for signature")
     
-    document = await db.documents.find_one({"id": document_id})
+    document = await db.documents.find_one({"id": document_id}, {"_id": 0})
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
     # Create signature hash
-    signature_data = f"{current_user['id']}{document_id}{reason}{datetime.now().isoformat()}"
-    signature_hash = hashlib.sha256(signature_data.encode()).hexdigest()
+    # Fed incrementally; same digest as hashing the concatenated fields
+    signature_digest = hashlib.sha256()
+    for part in (current_user["id"], document_id, reason, datetime.now().isoformat()):
+        signature_digest.update(part.encode())
+    signature_hash = signature_digest.hexdigest()
     
     signature = ElectronicSignature(
         signer_id=current_user["id"],
@@ -496,14 +781,9 @@ async def get_audit_logs(
     if action:
         filter_query["action"] = action
     
-    logs = await db.audit_logs.find(filter_query).sort("timestamp", -1).skip(skip).limit(limit).to_list(length=limit)
+    logs = await db.audit_logs.find(filter_query, {"_id": 0}).sort("timestamp", -1).skip(skip).limit(limit).to_list(length=limit)
     total = await db.audit_logs.count_documents(filter_query)
     
-    # Convert ObjectId to string
-    for log in logs:
-        if '_id' in log:
-            log['_id'] = str(log['_id'])
-    
     return {
         "logs": logs,
         "total": total,
@@ -514,30 +794,34 @@ async def get_audit_logs(
 # Dashboard
 @app.get("/api/dashboard")
 async def get_dashboard_data(current_user: dict = Depends(get_current_user)):
-    total_documents = await db.documents.count_documents({})
-    pending_approvals = await db.documents.count_documents({"status": "UnderReview"})
-    approved_documents = await db.documents.count_documents({"status": "Approved"})
-    draft_documents = await db.documents.count_documents({"status": "Draft"})
-    
-    # Recent documents
-    recent_docs = await db.documents.find().sort("created_at", -1).limit(10).to_list(length=10)
-    
-    # Convert ObjectId to string in recent_docs
-    for doc in recent_docs:
-        if '_id' in doc:
-            doc['_id'] = str(doc['_id'])
-    
-    # Document types distribution
+    # Status counters and type distribution in a single aggregation round-trip
     pipeline = [
-        {"$group": {"_id": "$document_type", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}}
+        {"$facet": {
+            "total": [{"$count": "n"}],
+            "pending": [{"$match": {"status": "UnderReview"}}, {"$count": "n"}],
+            "approved": [{"$match": {"status": "Approved"}}, {"$count": "n"}],
+            "draft": [{"$match": {"status": "Draft"}}, {"$count": "n"}],
+            "types": [
+                {"$group": {"_id": "$document_type", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1}}
+            ]
+        }}
     ]
-    doc_types = await db.documents.aggregate(pipeline).to_list(length=None)
     
-    # Convert ObjectId to string in doc_types
-    for doc_type in doc_types:
-        if '_id' in doc_type:
-            doc_type['_id'] = str(doc_type['_id'])
+    # Recent documents are fetched concurrently with the counters
+    (stats,), recent_docs = await asyncio.gather(
+        db.documents.aggregate(pipeline).to_list(length=1),
+        db.documents.find({}, {"_id": 0}).sort("created_at", -1).limit(10).to_list(length=10)
+    )
+    
+    def facet_count(name):
+        return stats[name][0]["n"] if stats[name] else 0
+    
+    total_documents = facet_count("total")
+    pending_approvals = facet_count("pending")
+    approved_documents = facet_count("approved")
+    draft_documents = facet_count("draft")
+    doc_types = stats["types"]
     
     return {
         "stats": {
@@ -557,23 +841,20 @@ async def search_documents(
     document_type: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
-    filter_query = {
-        "$or": [
-            {"title": {"$regex": q, "$options": "i"}},
-            {"description": {"$regex": q, "$options": "i"}},
-            {"tags": {"$regex": q, "$options": "i"}}
-        ]
-    }
+    if len(q) < 3:
+        # Too short for the text index; fall back to an anchored prefix match
+        prefix = {"$regex": f"^{re.escape(q)}", "$options": "i"}
+        filter_query = {"$or": [{"title": prefix}, {"description": prefix}, {"tags": prefix}]}
+        sort = [("created_at", -1)]
+    else:
+        filter_query = {"$text": {"$search": q}}
+        # MongoDB 4.4+ sorts by relevance without projecting the score into results
+        sort = [("score", {"$meta": "textScore"})]
     
     if document_type:
         filter_query["document_type"] = document_type
     
-    documents = await db.documents.find(filter_query).limit(20).to_list(length=20)
-    
-    # Convert ObjectId to string
-    for doc in documents:
-        if '_id' in doc:
-            doc['_id'] = str(doc['_id'])
+    documents = await db.documents.find(filter_query, {"_id": 0}).sort(sort).limit(20).to_list(length=20)
     
     await log_audit(current_user["id"], current_user["full_name"], "SEARCH_PERFORMED", "Search", q, {"query": q, "type": document_type})
     
@@ -581,9 +862,60 @@ async def search_documents(
 
 # Configuration
 @app.get("/api/config/document-types")
-async def get_document_types():
+async def get_document_types(if_none_match: Optional[str] = Header(None)):
+    headers = {"Cache-Control": "public, max-age=3600", "ETag": _DOCUMENT_TYPES_ETAG}
+    if if_none_match == _DOCUMENT_TYPES_ETAG:
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=_DOCUMENT_TYPES_JSON,
+        media_type="application/json",
+        headers=headers
+    )
+
+# Batch reads
+MAX_BATCH_SIZE = 20
+
+async def _document_types_body(user):
     return {"document_types": DOCUMENT_CATEGORIES}
 
+# path -> (params model, handler called with the validated params)
+_BATCH_READ_HANDLERS = {
+    "health": (BatchNoParams, lambda user: health_check()),
+    "dashboard": (BatchNoParams, lambda user: get_dashboard_data(current_user=user)),
+    "documents": (BatchDocumentsParams, lambda user, **params: get_documents(current_user=user, **params)),
+    "search": (BatchSearchParams, lambda user, **params: search_documents(current_user=user, **params)),
+    "audit": (BatchAuditParams, lambda user, **params: get_audit_logs(current_user=user, **params)),
+    "config/document-types": (BatchNoParams, _document_types_body),
+}
+
+async def _run_batch_item(item: BatchReadItem, current_user: dict):
+    if item.path not in _BATCH_READ_HANDLERS:
+        return {"status": 404, "body": {"detail": "Unknown batch path"}}
+    params_model, handler = _BATCH_READ_HANDLERS[item.path]
+    try:
+        params = params_model.model_validate(item.params)
+    except ValidationError as e:
+        # Same status and detail shape as FastAPI's query validation on the real route
+        detail = [{"type": error["type"], "loc": ["query", *error["loc"]], "msg": error["msg"]} for error in e.errors()]
+        return {"status": 422, "body": {"detail": detail}}
+    try:
+        return {"status": 200, "body": await handler(current_user, **params.model_dump())}
+    except HTTPException as e:
+        return {"status": e.status_code, "body": {"detail": e.detail}}
+    except PyMongoError:
+        logger.exception("Batch read of %s failed", item.path)
+        return {"status": 500, "body": {"detail": "Database error"}}
+
+@app.post("/api/batch")
+async def batch_read(batch: BatchReadRequest, current_user: dict = Depends(get_current_user)):
+    # Several read endpoints answered in one round-trip; each item goes through
+    # the same handler, role checks and query bounds as its GET route
+    if len(batch.requests) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail="Too many batch requests")
+    
+    responses = await asyncio.gather(*(_run_batch_item(item, current_user) for item in batch.requests))
+    return {"responses": responses}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file